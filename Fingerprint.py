@@ -15,7 +15,8 @@ Wi-Fi Fingerprinting & MAC Association
 - IE_Sequence: ID(bitlen) in bits
 """
 import hashlib
-from scapy.all import rdpcap, Dot11Elt, Dot11
+import io
+from scapy.all import sniff, Dot11Elt, Dot11
 from collections import defaultdict
 import pandas as pd
 import re
@@ -27,44 +28,43 @@ CSV_FILE   = "vol1-C..HeAt_2-01.csv"
 OUTPUT_CSV = "fingerprint_with_rate_and_ie_heuristics.csv"
 
 # --- ID-Sets ---
-STABLE_IDS = {45, 127, 221}   # HT Capabilities, Extended Caps, Vendor Specific
-RATE_IDS   = {1, 50}           # Supported Rates, Extended Rates
+STABLE_IDS = frozenset({45, 127, 221})   # HT Capabilities, Extended Caps, Vendor Specific
+RATE_IDS   = frozenset({1, 50})          # Supported Rates, Extended Rates
+HASHED_IDS = STABLE_IDS | RATE_IDS
+ID_BYTES   = bytes(range(256))           # ID_BYTES[i:i+1] == bytes([i]), no list per IE
 
 parser = manuf.MacParser()
 
-def hash_ies(ies, ids):
+def hash_ies(ies):
     """
-    SHA256 nach relevanten IE im paper
+    BLAKE2b (128 bit) nach relevanten IE im paper, nur Fingerprint-Key, kein Sicherheitszweck
+    returns (stable hash, rate hash) in one pass over the sorted IEs
     """
-    raw = b""
+    stable = hashlib.blake2b(digest_size=16)
+    rate = hashlib.blake2b(digest_size=16)
     for i, info in sorted(ies):
-        if i not in ids:
+        if i not in HASHED_IDS:
             continue
 
-        if i == 221:
-            raw += bytes([i])
-            raw += info[:4]
-        else:
-            raw += bytes([i]) + info
+        h = stable if i in STABLE_IDS else rate
+        h.update(ID_BYTES[i:i+1])
+        h.update(info[:4] if i == 221 else info)
 
-    return hashlib.sha256(raw).hexdigest()
+    return stable.hexdigest(), rate.hexdigest()
 
 # CSV, global vs. random MACs 
+with open(CSV_FILE, "rb") as f:
+    raw = f.read()
+# Station block only; probed ESSIDs add a variable number of columns, keep just the MAC
+st_pos = raw.find(b"Station MAC")
 real_macs = set()
-with open(CSV_FILE, encoding="latin1") as f:
-
-    for line in f:
-        if line.startswith("Station MAC"):
-            break
-    for line in f:
-        cols = [c.strip() for c in line.split(",")]
-        if len(cols) < 1 or len(cols[0]) != 17:
-            continue
-        mac = cols[0].upper()
-        fb  = int(mac.split(":")[0], 16)
-
-        if not (fb & 0x02):
-            real_macs.add(mac)
+if st_pos != -1:
+    st = pd.read_csv(io.BytesIO(raw[st_pos:]), encoding="latin1",
+                     header=None, skiprows=1, names=["station mac"], usecols=[0], dtype=str)
+    macs = st["station mac"].str.strip().str.upper()
+    macs = macs[macs.str.len() == 17]
+    fb = macs.str[:2].apply(int, base=16).astype(int)
+    real_macs = set(macs[(fb & 0x02) == 0])
 
 # metrics
 fmap = defaultdict(lambda: {
@@ -77,14 +77,18 @@ fmap = defaultdict(lambda: {
     'reals': set(),
     'randoms': set(),
 })
+all_ssids = set()   # union of all entry['ssids'], kept while building fmap
 
-for pkt in rdpcap(PCAP_FILE):
+def handle(pkt):
+    """
+    Add one probe request to its fingerprint entry
+    """
     if not pkt.haslayer(Dot11) or pkt.type != 0 or pkt.subtype != 4:
-        continue
+        return
 
     mac = (pkt.addr2 or "").upper()
     if not mac:
-        continue
+        return
 
     ies = []
     ssid_tmp = None
@@ -110,10 +114,9 @@ for pkt in rdpcap(PCAP_FILE):
             break
 
     if not ies:
-        continue
+        return
 
-    fp_stable = hash_ies(ies, STABLE_IDS)
-    fp_rate   = hash_ies(ies, RATE_IDS)
+    fp_stable, fp_rate = hash_ies(ies)
 
     entry = fmap[fp_stable]
 
@@ -125,64 +128,77 @@ for pkt in rdpcap(PCAP_FILE):
 
 
     entry['times'].append(pkt.time)
-    if hasattr(pkt, 'dBm_AntSignal'):
-        entry['powers'].append(pkt.dBm_AntSignal)
-    if hasattr(pkt, 'Channel'):
-        entry['channels'].append(pkt.Channel)
+    power = getattr(pkt, 'dBm_AntSignal', None)
+    if power is not None:
+        entry['powers'].append(power)
+    channel = getattr(pkt, 'Channel', None)
+    if channel is not None:
+        entry['channels'].append(channel)
 
     if ssid_tmp:
         entry['ssids'].add(ssid_tmp)
+        all_ssids.add(ssid_tmp)
 
     if mac in real_macs:
         entry['reals'].add(mac)
     else:
         entry['randoms'].add(mac)
 
+# BPF prefilter: libpcap drops everything but probe requests before scapy dissects
+try:
+    sniff(offline=PCAP_FILE, filter="type mgt subtype probe-req", store=False, prn=handle)
+except (ImportError, OSError):
+    print("libpcap/tcpdump not available, reading capture without BPF filter")
+    sniff(offline=PCAP_FILE, store=False, prn=handle)
+
 # Heuristic assignment
-assign = {}
-for fp, data in fmap.items():
-    assign[fp] = {'real': '', 'randoms': sorted(data['randoms'])}
-    best = (None, 0)
-    for rand in data['randoms']:
-        for real in data['reals']:
-            score = 0
-
-            # Time difference
-            if data['times']:
-                dt = abs(max(data['times']) - min(data['times']))
-                if dt < 60:
-                    score += 5
-                elif dt < 300:
-                    score += 2
-
-            # RSSI Difference
-            if data['powers']:
-                diff = abs(max(data['powers']) - min(data['powers']))
-                if diff < 5:
-                    score += 3
-                elif diff < 15:
-                    score += 1
-
-            # Channel consistency
-            if data['channels'] and len(set(data['channels'])) == 1:
-                score += 2
-
-            # Probe SSID match
-            if data['ssids']:
-                score += 10
-
-            # IE stable hash match
+def base_score(data):
+    """
+    Score from per-fingerprint aggregates (same for every rand/real pair)
+    """
+    score = 0
+
+    # Time difference
+    if data['times']:
+        dt = abs(max(data['times']) - min(data['times']))
+        if dt < 60:
+            score += 5
+        elif dt < 300:
+            score += 2
+
+    # RSSI Difference
+    if data['powers']:
+        diff = abs(max(data['powers']) - min(data['powers']))
+        if diff < 5:
             score += 3
+        elif diff < 15:
+            score += 1
+
+    # Channel consistency
+    if data['channels'] and len(set(data['channels'])) == 1:
+        score += 2
+
+    # Probe SSID match
+    if data['ssids']:
+        score += 10
 
-            # IE rate hash match
-            if len(data['rate_hashes']) == 1:
-                score += 2
+    # IE stable hash match
+    score += 3
 
-            if score > best[1]:
-                best = (real, score)
+    # IE rate hash match
+    if len(data['rate_hashes']) == 1:
+        score += 2
 
-    if best[0] and best[1] >= 5:
-        assign[fp]['real'] = best[0]
+    return score
+
+assign = {}
+for fp, data in fmap.items():
+    assign[fp] = {'real': '', 'randoms': sorted(data['randoms'])}
+    # score is the same for every (rand, real) pair, so the first pair wins
+    if not data['randoms'] or not data['reals']:
+        continue
+    if base_score(data) >= 5:
+        assign[fp]['real'] = next(iter(data['reals']))
 
 
 rows = []
@@ -209,7 +225,7 @@ print(f"[+] Result in {OUTPUT_CSV}")
 total_fps = len(fmap)
 total_random = sum(len(v['randoms']) for v in fmap.values())
 total_real = sum(len(v['reals']) for v in fmap.values())
-total_ssids = len(set().union(*[v['ssids'] for v in fmap.values()]))
+total_ssids = len(all_ssids)
 total_packets = sum(len(v['times']) for v in fmap.values())
 matched_fps = sum(1 for fp in fmap if assign[fp]['real'])
 
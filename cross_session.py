@@ -3,6 +3,8 @@
 
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import os
 import pandas as pd
 import csv
 
@@ -19,47 +21,58 @@ CSV_FILES = [
     "vol1-C..SH_22-01.kismet.csv"
 ]
 
+# only columns used below, kismet CSVs have 20+
+USECOLS = ["FirstTime", "LastTime", "BestQuality", "ESSID"]
+
 def extract_valid_essids(file_path):
+    """Return (session name, set of valid ESSIDs) for one kismet CSV"""
+    read_kw = dict(delimiter=";", na_filter=False, usecols=USECOLS, dtype={"ESSID": "string"})
     try:
-        df = pd.read_csv(file_path, delimiter=";", encoding="utf-8", na_filter=False)
+        df = pd.read_csv(file_path, encoding="utf-8", **read_kw)
     except UnicodeDecodeError:
-        df = pd.read_csv(file_path, delimiter=";", encoding="latin1", na_filter=False)
+        df = pd.read_csv(file_path, encoding="latin1", **read_kw)
 
+    # blanks stay "" with na_filter=False, so coerce instead of a strict dtype
     df["FirstTime"] = pd.to_datetime(df["FirstTime"], errors="coerce")
     df["LastTime"] = pd.to_datetime(df["LastTime"], errors="coerce")
-    df["BestQuality"] = pd.to_numeric(df["BestQuality"], errors="coerce")
-    df["ESSID"] = df["ESSID"].astype(str)
+    df["BestQuality"] = pd.to_numeric(df["BestQuality"], errors="coerce", downcast="float")
 
     df = df.dropna(subset=["FirstTime", "LastTime", "BestQuality"])
     df = df[df["BestQuality"] > SNR_LIMIT]
     df = df[df["ESSID"].str.strip() != ""]
 
-    return set(df["ESSID"].unique())
+    return Path(file_path).stem, set(df["ESSID"].unique())
+
+
+def main():
+    essid_sessions = defaultdict(set)
 
+    # files are independent, parse them on separate cores
+    workers = min(len(CSV_FILES), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for session, essids in ex.map(extract_valid_essids, CSV_FILES):
+            for essid in essids:
+                essid_sessions[essid].add(session)
 
-essid_sessions = defaultdict(set)
 
-for file in CSV_FILES:
-    session = Path(file).stem
-    essids = extract_valid_essids(file)
-    for essid in essids:
-        essid_sessions[essid].add(session)
+    common_essids = {
+        essid: sess for essid, sess in essid_sessions.items() if len(sess) >= 2
+    }
 
+    sorted_common_essids = sorted(
+        common_essids.items(), key=lambda x: len(x[1]), reverse=True
+    )
 
-common_essids = {
-    essid: sess for essid, sess in essid_sessions.items() if len(sess) >= 2
-}
 
-sorted_common_essids = sorted(
-    common_essids.items(), key=lambda x: len(x[1]), reverse=True
-)
+    output_path = "common_essids.csv"
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ESSID", "Sessions", "Count"])
+        for essid, sessions in sorted_common_essids:
+            writer.writerow([essid, ", ".join(sorted(sessions)), len(sessions)])
 
+    print(f"saved in {output_path}")
 
-output_path = "common_essids.csv"
-with open(output_path, "w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerow(["ESSID", "Sessions", "Count"])
-    for essid, sessions in sorted_common_essids:
-        writer.writerow([essid, ", ".join(sorted(sessions)), len(sessions)])
 
-print(f"saved in {output_path}")
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,12 @@ import sys
 import string
 from datetime import timedelta
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import matplotlib.colors as mcolors
+from matplotlib.collections import LineCollection
 
 # Parameters
 CSV_FILE  = Path("vol1-C..sha_1-01.kismet.csv")
@@ -55,10 +57,13 @@ rows = len(names_sorted)
 
 name_to_y = {name: idx for idx, name in enumerate(names_sorted)}
 
-all_qualities = df_top["BestQuality"].tolist()
-min_q = min(all_qualities)
-max_q = max(all_qualities)
-norm = mcolors.Normalize(vmin=min_q, vmax=max_q)
+# column -> array conversions done once for the whole plot
+x0 = mdates.date2num(df_top["FirstTime"].to_numpy())
+x1 = mdates.date2num(df_top["LastTime"].to_numpy())
+ys = df_top["ESSID"].map(name_to_y).to_numpy()
+qualities = df_top["BestQuality"].to_numpy()
+
+norm = mcolors.Normalize(vmin=qualities.min(), vmax=qualities.max())
 cmap = plt.cm.get_cmap("RdYlGn")
 
 
@@ -66,22 +71,18 @@ fig_height = 0.35 * rows + 2
 fig, ax = plt.subplots(figsize=(12, fig_height))
 
 
-for _, row in df_top.iterrows():
-    essid = row["ESSID"]
-    y = name_to_y[essid]
-    start = row["FirstTime"]
-    end = row["LastTime"]
-    quality = row["BestQuality"]
-    color = cmap(norm(quality))
-
+segs = np.stack([np.column_stack([x0, ys]), np.column_stack([x1, ys])], axis=1)
+colors = cmap(norm(qualities))
 
-    ax.hlines(y, start, end, colors="#000000", linewidth=6, linestyles="solid", alpha=0.8)
-    ax.hlines(y, start, end, colors=color, linewidth=4, linestyles="solid")
+# border first, colored bar on top
+ax.add_collection(LineCollection(segs, colors="#000000", linewidths=6, linestyles="solid", alpha=0.8))
+ax.add_collection(LineCollection(segs, colors=colors, linewidths=4, linestyles="solid"))
 
 
-allowed = string.printable + "ÄÖÜäöüß€°–—…“”‘’"
+ALLOWED = frozenset(map(ord, string.printable + "ÄÖÜäöüß€°–—…“”‘’"))
 def clean_label(text: str) -> str:
-    return "".join(ch for ch in text if ch in allowed)
+    # delete table holds only the code points actually present in text
+    return text.translate(dict.fromkeys(set(map(ord, text)) - ALLOWED))
 
 ax.set_yticks(range(rows))
 
@@ -97,13 +98,12 @@ ax.set_title(
     f"Timeline Top {TOP_N} Total Duration\n"
     f" BestQuality > {SNR_LIMIT} dBm"
 )
+ax.xaxis_date()
 ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M"))
 ax.grid(axis="x", linestyle="--", alpha=0.3)
 
 
-global_min = df_top["FirstTime"].min()
-global_max = df_top["LastTime"].max()
-ax.set_xlim(global_min, global_max)
+ax.set_xlim(x0.min(), x1.max())
 
 
 sm = plt.cm.ScalarMappable(norm=norm, cmap=cmap)
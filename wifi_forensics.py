@@ -41,34 +41,50 @@ except ImportError:
     LXML_OK = False
 
 try:
-    from scapy.all import PcapReader, Dot11, EAPOL
+    from scapy.all import sniff, Dot11, EAPOL
     SCAPY_OK = True
 except ImportError:
     SCAPY_OK = False
 
 try:
-    from tqdm import tqdm
+    import pyarrow  # noqa: F401  (Arrow string kernels for pandas .str ops)
+    PYARROW_OK = True
 except ImportError:
-    def tqdm(x, **k): return x
+    PYARROW_OK = False
+
+
+def _split_block(lines: pd.Series, header: list[str]):
+    """Split lines into len(header) fields; surplus commas stay in the last one."""
+    n = len(header) - 1
+    lines = lines[lines.str.count(",") >= n]
+    if lines.empty:
+        return pd.DataFrame(columns=header, dtype=object)
+    df = lines.str.split(",", n=n, expand=True)
+    df = df.reindex(columns=range(len(header))).set_axis(header, axis=1)
+    return df.apply(lambda c: c.str.strip()).reset_index(drop=True)
 
 
 def split_airodump_csv(path: Path):
     """Return AP-DF, Station-DF from CSV."""
-    raw = path.read_text(encoding="latin1", errors="ignore")
-    ap_block, st_block = raw.split("\n\n", 1)
-    ap_lines = [ln.strip() for ln in ap_block.splitlines() if ln.strip()]
-    header = [h.strip() for h in ap_lines[0].split(",")]
-    ap_df = pd.DataFrame(
-        [ln.split(",", len(header)-1)[:len(header)] for ln in ap_lines[1:]],
-        columns=header
-    ).rename(columns=str.lower)
-    st_lines = [ln.strip() for ln in st_block.splitlines() if ln.strip()]
+    raw = path.read_bytes().replace(b"\r\n", b"\n").lstrip()
+    blank = raw.index(b"\n\n")
+    # airodump does not quote fields, but ESSIDs and probed essids may contain
+    # commas, so the C parser cannot be used; split each line vectorized instead
+    ap_lines = pd.Series(raw[:blank].decode("latin1").splitlines())
+    ap_lines = ap_lines[ap_lines.str.strip() != ""]
+    header = [h.strip().lower() for h in ap_lines.iloc[0].split(",")]
+    # essid is second to last: split off the trailing key from the right
+    ap_df = _split_block(ap_lines.iloc[1:], header[:-1])
+    if ap_df.empty:
+        ap_df[header[-1]] = pd.Series(dtype=object)
+    else:
+        ap_df[header[-2:]] = ap_df[header[-2]].str.rsplit(",", n=1, expand=True) \
+            .reindex(columns=range(2)).apply(lambda c: c.str.strip())
+    st_lines = pd.Series(raw[blank+2:].decode("latin1").splitlines())
+    st_lines = st_lines[st_lines.str.strip() != ""]
     st_hdr = ["station mac","first time seen","last time seen",
               "power","# packets","bssid","probed essids"]
-    st_df = pd.DataFrame(
-        [ln.split(",", 6) for ln in st_lines[1:] if ln.count(",") >= 6],
-        columns=st_hdr
-    ).rename(columns=str.lower)
+    st_df = _split_block(st_lines.iloc[1:], st_hdr)
     return ap_df, st_df
 
 
@@ -77,16 +93,19 @@ def parse_netxml(path: Path):
     if not LXML_OK:
         print("lxml not installed, skipping NetXML")
         return {}, {}, {}
-    root = LET.parse(str(path), LET.XMLParser(recover=True, encoding="utf-8")).getroot()
     vendor, channel, enc = {}, {}, {}
-    for net in root.xpath("//wireless-network"):
+    for _, net in LET.iterparse(str(path), tag="wireless-network",
+                                recover=True, encoding="utf-8"):
         b = (net.findtext("BSSID") or "").upper()
-        if not b:
-            continue
-        if (m := net.findtext("manuf")): vendor[b] = m.strip()
-        if (c := net.findtext("channel")): channel[b] = c.strip()
-        encs = [e.text for e in net.findall("encryption")]
-        if encs: enc[b] = ",".join(sorted(set(encs)))
+        if b:
+            if (m := net.findtext("manuf")): vendor[b] = m.strip()
+            if (c := net.findtext("channel")): channel[b] = c.strip()
+            encs = [e.text for e in net.findall("encryption")]
+            if encs: enc[b] = ",".join(sorted(set(encs)))
+        # free the finished subtree and its already processed siblings
+        net.clear()
+        while net.getprevious() is not None:
+            del net.getparent()[0]
     return vendor, channel, enc
 
 
@@ -96,51 +115,77 @@ def count_handshakes(pcap: Path):
         print("scapy not installed, skipping handshake scan")
         return {}
     ctr = Counter()
-    with PcapReader(str(pcap)) as cap:
-        for pkt in tqdm(cap, desc="Scanning pcap for EAPOL"):
-            if pkt.haslayer(Dot11) and pkt.haslayer(EAPOL):
-                d = pkt[Dot11]
-                addr = (d.addr1, d.addr2, d.addr3)
-                ds = d.FCfield & 3
-                if ds == 0:
-                    ap, sta = addr[1], addr[0]
-                elif ds == 1:
-                    ap, sta = addr[2], addr[1]
-                elif ds == 2:
-                    ap, sta = addr[0], addr[2]
-                else:
-                    ap, sta = (None, None)
-                if ap and sta:
-                    ctr[(ap.upper(), sta.upper())] += 1
+
+    def on_eapol(pkt):
+        if not (pkt.haslayer(Dot11) and pkt.haslayer(EAPOL)):
+            return
+        d = pkt[Dot11]
+        addr = (d.addr1, d.addr2, d.addr3)
+        ds = d.FCfield & 3
+        if ds == 0:
+            ap, sta = addr[1], addr[0]
+        elif ds == 1:
+            ap, sta = addr[2], addr[1]
+        elif ds == 2:
+            ap, sta = addr[0], addr[2]
+        else:
+            ap, sta = (None, None)
+        if ap and sta:
+            ctr[(ap.upper(), sta.upper())] += 1
+
+    # BPF on the LLC/SNAP ethertype: libpcap drops non-EAPOL frames before scapy
+    print("Scanning pcap for EAPOL")
+    try:
+        sniff(offline=str(pcap), filter="ether proto 0x888e", store=False, prn=on_eapol)
+    except (ImportError, OSError):
+        print("libpcap/tcpdump not available, scanning pcap without BPF filter")
+        sniff(offline=str(pcap), store=False, prn=on_eapol)
     return ctr
 
 
-def plot_beacon_rate(log_csv: Path, out: Path):
-    log = pd.read_csv(log_csv, sep=";", encoding="latin1", on_bad_lines="skip")
-    if "Type" not in log.columns:
-        return
-    bea = log[log["Type"] == "Beacon"]
-    if bea.empty:
+def plot_beacon_rate(log_csv: Path, out: Path, chunksize: int = 200_000):
+    chunks = pd.read_csv(log_csv, sep=";", encoding="latin1", on_bad_lines="skip",
+                         usecols=lambda c: c in ("Type", "Timestamp"),
+                         dtype={"Type": "category"}, chunksize=chunksize)
+    total = pd.Series(dtype="float64")
+    for chunk in chunks:
+        if "Type" not in chunk.columns:
+            return
+        bea = chunk[chunk["Type"] == "Beacon"]
+        ts = pd.to_datetime(bea["Timestamp"], unit="s")
+        total = total.add(ts.dt.floor("1min").value_counts(), fill_value=0)
+    if total.empty:
         return
-    bea["ts"] = pd.to_datetime(bea["Timestamp"], unit="s")
-    bea.set_index("ts").resample("1T").size().plot(figsize=(7,3))
+    total.sort_index().asfreq("1min", fill_value=0).plot(figsize=(7,3))
     plt.xlabel("Time"); plt.ylabel("Beacons/minute")
     plt.title("Beacon traffic over time")
     plt.tight_layout(); plt.savefig(out, dpi=150); plt.close()
 
 
-def plot_station_rssi(log_csv: Path, stations: pd.DataFrame, out: Path):
-    log = pd.read_csv(log_csv, sep=";", encoding="latin1", on_bad_lines="skip")
-    if "Signal" not in log.columns:
-        return
+def plot_station_rssi(log_csv: Path, stations: pd.DataFrame, out: Path, chunksize: int = 200_000):
     stations["# packets"] = pd.to_numeric(stations["# packets"], errors="coerce").fillna(0).astype(int)
     top = stations.nlargest(10, "# packets")
+    top_set = set(top["station mac"].str.upper())
+    chunks = pd.read_csv(log_csv, sep=";", encoding="latin1", on_bad_lines="skip",
+                         usecols=lambda c: c in ("MAC", "Timestamp", "Signal"),
+                         dtype={"MAC": "string"}, chunksize=chunksize)
+    parts = []
+    for chunk in chunks:
+        if "Signal" not in chunk.columns:
+            return
+        chunk["MAC"] = chunk["MAC"].str.upper()
+        parts.append(chunk[chunk["MAC"].isin(top_set)])
+    if not parts:
+        return
+    filt = pd.concat(parts)
+    filt["ts"] = pd.to_datetime(filt["Timestamp"], unit="s", cache=True)
     plt.figure(figsize=(8,4))
-    for mac in top["station mac"]:
-        seg = log[log["MAC"].str.lower() == mac.lower()]
-        if seg.empty:
+    segs = dict(tuple(filt.groupby("MAC")))
+    # legend follows the top-talker rank
+    for mac in top["station mac"].str.upper():
+        if mac not in segs:
             continue
-        seg["ts"] = pd.to_datetime(seg["Timestamp"], unit="s")
+        seg = segs[mac]
         plt.plot(seg["ts"], seg["Signal"], label=mask_mac(mac))
     if plt.gca().lines:
         plt.legend(fontsize=6, title="Station")
@@ -152,9 +197,8 @@ def plot_station_rssi(log_csv: Path, stations: pd.DataFrame, out: Path):
 
 def mask_mac(mac: str) -> str:
     """anonymize mac addresses """
-    mac = mac.upper()
-    parts = mac.split(":")
-    return ":".join(parts[:4]) + ":****" if len(parts) == 6 else mac
+    # XX:XX:XX:XX:XX:XX -> first 11 chars are the first 4 octets
+    return mac[:11].upper() + ":****" if len(mac) == 17 else mac.upper()
 
 
 def main():
@@ -168,21 +212,24 @@ def main():
 
 
     aps, stn = split_airodump_csv(args.csv)
+    if PYARROW_OK:
+        stn = stn.convert_dtypes(dtype_backend="pyarrow")
     aps.to_csv(OUT / "access_points.csv", index=False)
     stn.to_csv(OUT / "stations.csv",      index=False)
 
  
-    mapping = stn[stn["bssid"] != "(not associated)"].copy()
-    mapping["associated essid"] = mapping["bssid"].map(
-        aps.set_index("bssid")["essid"].to_dict())
+    mapping = stn[stn["bssid"] != "(not associated)"].merge(
+        aps[["bssid", "essid"]].drop_duplicates("bssid")
+            .rename(columns={"essid": "associated essid"}),
+        on="bssid", how="left")
     mapping.to_csv(OUT / "client_ap_mapping.csv", index=False)
     mapping.groupby("bssid")["station mac"].apply(list).reset_index().to_csv(
         OUT / "ap_clients.csv", index=False)
 
-    probes = stn[stn["probed essids"].str.strip() != ""].copy()
-    probes["probe list"] = probes["probed essids"].str.split(",")
-    probes[["station mac", "probe list"]].to_csv(
-        OUT / "station_probes.csv", index=False)
+    probes = stn.loc[stn["probed essids"].str.strip() != "", ["station mac", "probed essids"]]
+    # back to Python lists so the CSV keeps the ['a', 'b'] notation
+    probes.assign(**{"probe list": lambda d: d["probed essids"].str.split(",").tolist()})[
+        ["station mac", "probe list"]].to_csv(OUT / "station_probes.csv", index=False)
 
 
     if args.netxml and args.netxml.exists():
@@ -266,16 +313,16 @@ def main():
     plt.title("Encryption modes in capture (split types)")
     plt.tight_layout(); plt.savefig(OUT / "encryption_distribution.png", dpi=150); plt.close()
 
-    channel_map = aps.drop_duplicates('bssid').set_index('bssid')['channel']
-    station_mapping = mapping.copy()
-    station_mapping['channel'] = station_mapping['bssid'].map(channel_map)
+    station_mapping = mapping.merge(
+        aps[['bssid', 'channel']].drop_duplicates('bssid'), on='bssid', how='left')
     for ch, grp in station_mapping.groupby('channel'):
         safe_ch = f"ch_{int(ch)}" if pd.notna(ch) else "ch_unknown"
         grp.to_csv(OUT / f"stations_{safe_ch}.csv", index=False)
 
-    privacy_map = aps.drop_duplicates('bssid').set_index('bssid')['privacy']
-    station_enc = station_mapping.copy()
-    station_enc['privacy_types'] = station_enc['bssid'].map(privacy_map)
+    station_enc = station_mapping.merge(
+        aps[['bssid', 'privacy']].drop_duplicates('bssid')
+            .rename(columns={'privacy': 'privacy_types'}),
+        on='bssid', how='left')
     station_enc = station_enc.assign(
         privacy_types=station_enc['privacy_types'].str.upper().str.split(',')
     ).explode('privacy_types')